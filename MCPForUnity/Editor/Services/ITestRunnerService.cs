@@ -42,5 +42,11 @@ namespace MCPForUnity.Editor.Services
         /// Retrieve the cached results for a completed run.
         /// </summary>
         bool TryGetResult(string runId, out TestRunResult result);
+
+        /// <summary>
+        /// Retrieve a task that completes when the specified run (or the active run when runId is null) finishes.
+        /// Runs that already finished yield a completed task carrying their cached result.
+        /// </summary>
+        bool TryGetCompletionTask(string runId, out Task<TestRunResult> completionTask);
     }
 }
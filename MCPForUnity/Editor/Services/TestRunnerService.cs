@@ -107,7 +107,10 @@ namespace MCPForUnity.Editor.Services
                 try
                 {
                     string runGuid = _testRunnerApi.Execute(executionSettings);
-                    var managedRun = new ManagedTestRun(runGuid, request);
+                    var managedRun = new ManagedTestRun(runGuid, request)
+                    {
+                        CompletionTask = _runCompletionSource.Task,
+                    };
 
                     lock (_stateLock)
                     {
@@ -203,6 +206,21 @@ namespace MCPForUnity.Editor.Services
             return true;
         }
 
+        public bool TryGetCompletionTask(string runId, out Task<TestRunResult> completionTask)
+        {
+            var run = ResolveRun(runId, string.IsNullOrEmpty(runId));
+            if (run == null)
+            {
+                completionTask = null;
+                return false;
+            }
+
+            completionTask = run.Result != null
+                ? Task.FromResult(run.Result)
+                : run.CompletionTask;
+            return completionTask != null;
+        }
+
         public void Dispose()
         {
             try
@@ -486,6 +504,7 @@ namespace MCPForUnity.Editor.Services
             public DateTime? EndTimeUtc { get; set; }
             public TestRunState State { get; set; }
             public TestRunResult Result { get; set; }
+            public Task<TestRunResult> CompletionTask { get; set; }
         }
     }
 
@@ -0,0 +1,50 @@
+using MCPForUnity.Editor.Helpers;
+using MCPForUnity.Editor.Services;
+using Newtonsoft.Json.Linq;
+
+namespace MCPForUnity.Editor.Tools
+{
+    /// <summary>
+    /// Returns the status of the active or specified Unity test run and, once it has finished, its full results.
+    /// Lets pollers observe completion and fetch results in a single bridge round-trip.
+    /// </summary>
+    [McpForUnityTool("get_test_run_snapshot")]
+    public static class GetTestRunSnapshot
+    {
+        public static object HandleCommand(JObject @params)
+        {
+            string runId = @params?["runId"]?.ToString();
+            bool includeResult = @params?["includeResult"]?.ToObject<bool?>() ?? true;
+            var testService = MCPServiceLocator.Tests;
+
+            if (!testService.TryGetStatus(runId, out var status) || status == null)
+            {
+                string message = string.IsNullOrEmpty(runId)
+                    ? "No active or recent test run found."
+                    : $"Test run '{runId}' not found.";
+                return Response.Error(message);
+            }
+
+            TestRunResult result = null;
+            if (includeResult && IsFinished(status.State))
+            {
+                testService.TryGetResult(status.RunId, out result);
+            }
+
+            string summary = $"Run '{status.RunId}' is {status.State}";
+            return Response.Success(summary, new
+            {
+                status = status.ToSerializable(),
+                result = result?.ToSerializable(),
+            });
+        }
+
+        private static bool IsFinished(TestRunState state)
+        {
+            return state == TestRunState.Completed
+                || state == TestRunState.Failed
+                || state == TestRunState.Canceled
+                || state == TestRunState.Faulted;
+        }
+    }
+}
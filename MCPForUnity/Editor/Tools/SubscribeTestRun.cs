@@ -0,0 +1,68 @@
+using System;
+using System.Threading.Tasks;
+using MCPForUnity.Editor.Helpers;
+using MCPForUnity.Editor.Services;
+using Newtonsoft.Json.Linq;
+
+namespace MCPForUnity.Editor.Tools
+{
+    /// <summary>
+    /// Long-polls the active or specified Unity test run and responds as soon as it finishes,
+    /// including the run's full results unless includeResult is false.
+    /// Waits are bounded to stay within the bridge's per-command timeout; callers re-subscribe while "completed" is false.
+    /// </summary>
+    [McpForUnityTool("subscribe_test_run")]
+    public static class SubscribeTestRun
+    {
+        private const int DefaultWaitSeconds = 20;
+        private const int MaxWaitSeconds = 25; // Bridge aborts command processing after 30 seconds
+
+        public static async Task<object> HandleCommand(JObject @params)
+        {
+            string runId = @params?["runId"]?.ToString();
+            int waitSeconds = ParseWaitSeconds(@params?["timeoutSeconds"]);
+            bool includeResult = @params?["includeResult"]?.ToObject<bool?>() ?? true;
+            var testService = MCPServiceLocator.Tests;
+
+            if (!testService.TryGetCompletionTask(runId, out var completionTask))
+            {
+                string message = string.IsNullOrEmpty(runId)
+                    ? "No active or recent test run found."
+                    : $"Test run '{runId}' not found.";
+                return Response.Error(message);
+            }
+
+            if (!completionTask.IsCompleted)
+            {
+                await Task.WhenAny(completionTask, Task.Delay(TimeSpan.FromSeconds(waitSeconds))).ConfigureAwait(true);
+            }
+
+            bool completed = completionTask.IsCompleted;
+            testService.TryGetStatus(runId, out var status);
+            string resolvedId = status?.RunId ?? runId;
+            TestRunResult result = includeResult && completionTask.Status == TaskStatus.RanToCompletion
+                ? completionTask.Result
+                : null;
+            string summary = completed
+                ? $"Run '{resolvedId}' finished"
+                : $"Run '{resolvedId}' still in progress after {waitSeconds} seconds";
+
+            return Response.Success(summary, new
+            {
+                completed,
+                status = status?.ToSerializable(),
+                result = result?.ToSerializable(),
+            });
+        }
+
+        private static int ParseWaitSeconds(JToken token)
+        {
+            if (token != null && int.TryParse(token.ToString(), out var parsed) && parsed > 0)
+            {
+                return Math.Min(parsed, MaxWaitSeconds);
+            }
+
+            return DefaultWaitSeconds;
+        }
+    }
+}
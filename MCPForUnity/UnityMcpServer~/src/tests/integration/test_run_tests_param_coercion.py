@@ -0,0 +1,67 @@
+import asyncio
+
+from .test_helpers import DummyContext
+import tools._test_common as test_common
+import tools.run_tests as run_tests_mod
+
+
+def test_coerce_string_list_normalizes_and_dedupes():
+    assert test_common.coerce_string_list(None) is None
+    assert test_common.coerce_string_list("  A.Test ") == ["A.Test"]
+    assert test_common.coerce_string_list(["b", " a ", "b", None, "", "  "]) == ["b", "a"]
+    assert test_common.coerce_string_list(42) == ["42"]
+    assert test_common.coerce_string_list(["", None]) is None
+
+
+def test_combine_string_lists_preserves_first_seen_order():
+    combined = test_common.combine_string_lists(["x", "y"], None, "y", ("z", "x"))
+    assert combined == ["x", "y", "z"]
+    assert test_common.combine_string_lists(None, [], "") is None
+
+
+def test_run_tests_merges_filter_aliases(monkeypatch):
+    captured = {}
+
+    async def fake_async_send(cmd, params, **kwargs):
+        captured["params"] = params
+        return {"success": True, "data": {"runId": "r1", "state": "Queued"}}
+
+    class AsyncLogContext(DummyContext):
+        async def info(self, message):
+            self.log_info.append(message)
+
+    monkeypatch.setattr(run_tests_mod, "async_send_command_with_retry", fake_async_send)
+
+    asyncio.run(
+        run_tests_mod.run_tests(
+            ctx=AsyncLogContext(),
+            wait_for_completion=False,
+            test_names=["A", "B"],
+            tests="B",
+            group_names="G",
+            categories=["Fast"],
+            assembly_names=[],
+        )
+    )
+
+    params = captured["params"]
+    assert params["testNames"] == ["A", "B"]
+    assert params["groupNames"] == ["G"]
+    assert params["categoryNames"] == ["Fast"]
+    assert "assemblyNames" not in params
+
+
+def test_coerce_string_list_accepts_generic_iterables():
+    assert test_common.coerce_string_list(x for x in ("a", "b", "a")) == ["a", "b"]
+    assert test_common.coerce_string_list({"k": 1}) == ["k"]
+    assert test_common.coerce_string_list(frozenset({"only"})) == ["only"]
+
+
+def test_build_summary_message_handles_missing_counts():
+    message = test_common.build_summary_message
+    assert message("r", None) == "Run 'r' finished with state Unknown."
+    assert message("r", {"summary": None}) == "Run 'r' finished with state Unknown."
+    assert message("r", {"summary": {"resultState": "Passed"}}) == "Run 'r' finished with state Passed."
+    assert message("r", {"summary": {"resultState": "Failed", "total": 3, "passed": 2, "failed": 1}}) == (
+        "Run 'r' finished with state Failed: 2/3 passed, 1 failed, 0 skipped."
+    )
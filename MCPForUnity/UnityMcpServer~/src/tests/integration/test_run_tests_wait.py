@@ -0,0 +1,384 @@
+import asyncio
+import contextlib
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from .test_helpers import DummyContext
+from models import MCPResponse
+import tools._test_common as test_common
+import unity_connection
+
+
+class AsyncLogContext(DummyContext):
+    async def info(self, message):
+        self.log_info.append(message)
+
+
+class _FakeConnection:
+    instance_id = "Project@abc123"
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+        self.disconnected = False
+
+    def send_command(self, command_type, params):
+        self.sent.append((command_type, params))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class _FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def open_dedicated_connection(self, instance_identifier=None):
+        return self.conn
+
+
+def _unsupported(command_type):
+    return unity_connection.UnsupportedCommandError(f"Unknown or unsupported command type: {command_type}")
+
+
+def _recv_exact(sock, count):
+    data = b""
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class _FramedBridge:
+    """Minimal framed Unity bridge on localhost that only knows the given commands."""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.received = []
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        with client:
+            client.sendall(b"MCP/0.1 FRAMING=1\n")
+            while (header := _recv_exact(client, 8)) is not None:
+                command = json.loads(_recv_exact(client, struct.unpack(">Q", header)[0]))
+                self.received.append(command["type"])
+                handler = self.handlers.get(command["type"])
+                if handler is None:
+                    reply = {"status": "error", "error": f"Unknown or unsupported command type: {command['type']}"}
+                else:
+                    reply = {"status": "success", "result": handler(command["params"])}
+                payload = json.dumps(reply).encode("utf-8")
+                client.sendall(struct.pack(">Q", len(payload)) + payload)
+
+    def connect(self):
+        conn = unity_connection.UnityConnection(host="127.0.0.1", port=self.port, instance_id="Bridge@test")
+        assert conn.connect()
+        return conn
+
+    def close(self):
+        self._server.close()
+
+
+def _install_bridge(monkeypatch, conn, replies):
+    calls = []
+
+    async def fake_async_send(cmd, params, **kwargs):
+        calls.append(cmd)
+        if cmd not in replies:
+            return MCPResponse(success=False, error=f"Unknown or unsupported command type: {cmd}")
+        reply = replies[cmd]
+        return reply.pop(0) if isinstance(reply, list) else reply
+
+    monkeypatch.setattr(test_common, "get_unity_connection_pool", lambda: _FakePool(conn))
+    monkeypatch.setattr(test_common, "async_send_command_with_retry", fake_async_send)
+    monkeypatch.setattr(test_common, "_LEGACY_BRIDGES", {})
+    return calls
+
+
+def test_wait_uses_subscription_without_status_polling(monkeypatch):
+    conn = _FakeConnection([
+        {"success": True, "data": {"completed": False, "status": {"state": "Running"}}},
+        {"success": True, "data": {"completed": True, "status": {"state": "Completed"}}},
+    ])
+    calls = _install_bridge(monkeypatch, conn, {
+        "get_test_run_result": {"success": True, "data": {"runId": "r1", "summary": {"total": 1}}},
+    })
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(AsyncLogContext(), None, "r1", 30)
+    )
+
+    assert data == {"runId": "r1", "summary": {"total": 1}, "state": "Completed"}
+    assert calls == ["get_test_run_result"]
+    assert [cmd for cmd, _ in conn.sent] == ["subscribe_test_run", "subscribe_test_run"]
+    assert conn.disconnected
+    assert test_common._RUN_SUBSCRIPTIONS == {}
+
+
+def test_subscription_result_skips_result_fetch(monkeypatch):
+    conn = _FakeConnection([
+        {"success": True, "data": {
+            "completed": True,
+            "status": {"state": "Completed"},
+            "result": {"runId": "r12", "summary": {"total": 2}},
+        }},
+    ])
+    calls = _install_bridge(monkeypatch, conn, {})
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(AsyncLogContext(), None, "r12", 30)
+    )
+
+    assert data == {"runId": "r12", "summary": {"total": 2}, "state": "Completed"}
+    assert calls == []
+    assert conn.sent[0][1]["includeResult"] is True
+
+
+def test_wait_falls_back_to_polling_when_subscription_unsupported(monkeypatch):
+    conn = _FakeConnection([_unsupported("subscribe_test_run")])
+    calls = _install_bridge(monkeypatch, conn, {
+        "get_test_run_status": [
+            {"success": True, "data": {"runId": "r2", "state": "Running"}},
+            {"success": True, "data": {"runId": "r2", "state": "Completed"}},
+        ],
+        "get_test_run_result": {"success": True, "data": {"runId": "r2"}},
+    })
+    monkeypatch.setattr(test_common, "POLL_BACKOFF_BASE_SECONDS", 0)
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(AsyncLogContext(), None, "r2", 30)
+    )
+
+    assert data == {"runId": "r2", "state": "Completed"}
+    assert calls == ["get_test_run_status", "get_test_run_status", "get_test_run_result"]
+    assert list(test_common._LEGACY_BRIDGES) == ["Project@abc123"]
+
+
+def test_legacy_bridge_entries_expire(monkeypatch):
+    monkeypatch.setattr(test_common, "_LEGACY_BRIDGES", {})
+
+    test_common._mark_legacy_bridge(None)
+    test_common._mark_legacy_bridge("Project@abc123")
+    assert list(test_common._LEGACY_BRIDGES) == ["Project@abc123"]
+    assert test_common._is_legacy_bridge("Project@abc123")
+    assert not test_common._is_legacy_bridge("Other@def456")
+
+    monkeypatch.setattr(test_common, "LEGACY_BRIDGE_TTL_SECONDS", -1)
+    test_common._mark_legacy_bridge("Project@abc123")
+    assert not test_common._is_legacy_bridge("Project@abc123")
+    assert test_common._LEGACY_BRIDGES == {}
+
+
+def test_poll_delay_backs_off_to_cap():
+    base = test_common.POLL_BACKOFF_BASE_SECONDS
+    cap = test_common.POLL_BACKOFF_CAP_SECONDS
+
+    assert base * 0.5 <= test_common._next_poll_delay(0) <= base * 1.5
+    assert base * 2 * 0.5 <= test_common._next_poll_delay(1) <= base * 2 * 1.5
+    for attempt in (10, 100, 10_000):
+        assert cap * 0.5 <= test_common._next_poll_delay(attempt) <= cap * 1.5
+
+
+def test_poll_reuses_keepalive_connection(monkeypatch):
+    conn = _FakeConnection([ConnectionError("dedicated connection refused")])
+    calls = _install_bridge(monkeypatch, conn, {})
+    held = []
+
+    class _FakeKeepalive:
+        conn = _FakeConnection([])
+
+        async def send(self, command_type, params):
+            held.append(command_type)
+            return {"success": True, "data": {
+                "status": {"runId": "r5", "state": "Completed"},
+                "result": {"runId": "r5"},
+            }}
+
+    @contextlib.asynccontextmanager
+    async def fake_keepalive(instance_id=None):
+        yield _FakeKeepalive()
+
+    monkeypatch.setattr(test_common, "keepalive", fake_keepalive)
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(AsyncLogContext(), None, "r5", 30)
+    )
+
+    assert data == {"runId": "r5", "state": "Completed"}
+    assert held == ["get_test_run_snapshot"]
+    assert calls == []
+
+
+def test_poll_uses_fused_snapshot_command(monkeypatch):
+    conn = _FakeConnection([ConnectionError("dedicated connection refused")])
+    calls = _install_bridge(monkeypatch, conn, {
+        "get_test_run_snapshot": [
+            {"success": True, "data": {"status": {"runId": "r8", "state": "Running"}, "result": None}},
+            {"success": True, "data": {
+                "status": {"runId": "r8", "state": "Failed"},
+                "result": {"runId": "r8", "summary": {"total": 1, "failed": 1}},
+            }},
+        ],
+    })
+    monkeypatch.setattr(test_common, "POLL_BACKOFF_BASE_SECONDS", 0)
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(AsyncLogContext(), None, "r8", 30)
+    )
+
+    assert data == {"runId": "r8", "summary": {"total": 1, "failed": 1}, "state": "Failed"}
+    assert calls == ["get_test_run_snapshot", "get_test_run_snapshot"]
+
+
+def test_terminal_initial_snapshot_skips_waiting(monkeypatch):
+    conn = _FakeConnection([])
+    calls = _install_bridge(monkeypatch, conn, {
+        "get_test_run_result": {"success": True, "data": {"runId": "r6", "summary": {"total": 0}}},
+    })
+
+    data = asyncio.run(
+        test_common.wait_for_run_completion(
+            AsyncLogContext(), None, "r6", 30,
+            initial_snapshot={"runId": "r6", "state": "Completed"},
+        )
+    )
+
+    assert data == {"runId": "r6", "summary": {"total": 0}, "state": "Completed"}
+    assert calls == ["get_test_run_result"]
+    assert conn.sent == []
+
+
+def test_timeout_snapshot_drops_per_test_results():
+    exc = test_common.RunCompletionTimeout(
+        "r7", 5, {"runId": "r7", "state": "Running", "results": [{"name": "t"}], "elapsedSeconds": 5.0},
+    )
+
+    assert exc.snapshot == {"runId": "r7", "state": "Running"}
+    assert test_common.RunCompletionTimeout("r7", 5).snapshot == {}
+
+
+def test_poll_timeout_fires_near_deadline(monkeypatch):
+    conn = _FakeConnection([ConnectionError("dedicated connection refused")])
+    _install_bridge(monkeypatch, conn, {
+        "get_test_run_snapshot": {"success": True, "data": {"status": {"runId": "r10", "state": "Running"}}},
+    })
+    monkeypatch.setattr(test_common, "POLL_BACKOFF_BASE_SECONDS", 30)
+    monkeypatch.setattr(test_common, "POLL_BACKOFF_CAP_SECONDS", 30)
+
+    started = time.monotonic()
+    with pytest.raises(test_common.RunCompletionTimeout) as excinfo:
+        asyncio.run(test_common.wait_for_run_completion(AsyncLogContext(), None, "r10", 0.3))
+
+    assert time.monotonic() - started < 2
+    assert excinfo.value.snapshot == {"runId": "r10", "state": "Running"}
+
+
+def test_progress_log_interval_is_jittered():
+    interval = test_common.PROGRESS_LOG_INTERVAL
+    samples = {test_common._progress_log_interval() for _ in range(50)}
+
+    assert all(interval * 0.8 <= value <= interval * 1.2 for value in samples)
+    assert len(samples) > 1
+
+
+def test_subscription_probe_fails_fast_on_older_bridge(monkeypatch, tmp_path):
+    monkeypatch.setattr(unity_connection.Path, "home", lambda: tmp_path)
+    bridge = _FramedBridge({})
+    monkeypatch.setattr(test_common, "get_unity_connection_pool", lambda: _FakePool(bridge.connect()))
+
+    async def subscribe():
+        subscription = test_common._subscribe_to_run(None, "r9")
+        try:
+            await asyncio.wait_for(subscription.event.wait(), timeout=2)
+        finally:
+            subscription.release()
+        return subscription
+
+    started = time.monotonic()
+    try:
+        subscription = asyncio.run(subscribe())
+    finally:
+        bridge.close()
+
+    assert not subscription.completed
+    assert bridge.received == ["subscribe_test_run"]
+    assert time.monotonic() - started < 1
+
+
+def test_send_returns_unity_errors_without_pool_resend(monkeypatch):
+    calls = _install_bridge(monkeypatch, _FakeConnection([]), {"get_test_run_status": {"success": True}})
+
+    class _ErroringKeepalive:
+        def __init__(self, exc):
+            self.exc = exc
+
+        async def send(self, command_type, params):
+            raise self.exc
+
+    unity_error = asyncio.run(test_common._send(
+        None, "get_test_run_status", {}, _ErroringKeepalive(Exception("Command processing timed out"))))
+    dropped = asyncio.run(test_common._send(
+        None, "get_test_run_status", {}, _ErroringKeepalive(ConnectionResetError("reset"))))
+
+    assert isinstance(unity_error, MCPResponse)
+    assert unity_error.error == "Command processing timed out"
+    assert dropped == {"success": True}
+    assert calls == ["get_test_run_status"]
+
+
+def test_wait_on_older_bridge_skips_probes_after_first_reply(monkeypatch, tmp_path):
+    monkeypatch.setattr(unity_connection.Path, "home", lambda: tmp_path)
+    bridge = _FramedBridge({
+        "get_test_run_status": lambda p: {"success": True, "data": {"runId": p["runId"], "state": "Completed"}},
+        "get_test_run_result": lambda p: {"success": True, "data": {"runId": p["runId"]}},
+    })
+    calls = _install_bridge(monkeypatch, None, {})
+    monkeypatch.setattr(test_common, "get_unity_connection_pool", lambda: _FakePool(bridge.connect()))
+
+    @contextlib.asynccontextmanager
+    async def real_keepalive(instance_id=None):
+        yield unity_connection.KeepaliveConnection(bridge.connect())
+
+    monkeypatch.setattr(test_common, "keepalive", real_keepalive)
+
+    async def wait_twice():
+        first = await test_common.wait_for_run_completion(AsyncLogContext(), None, "r10", 30)
+        second = await test_common.wait_for_run_completion(AsyncLogContext(), None, "r11", 30)
+        return first, second
+
+    started = time.monotonic()
+    try:
+        first, second = asyncio.run(wait_twice())
+    finally:
+        bridge.close()
+
+    assert first == {"runId": "r10", "state": "Completed"}
+    assert second == {"runId": "r11", "state": "Completed"}
+    assert bridge.received == [
+        "subscribe_test_run", "get_test_run_status", "get_test_run_result",
+        "get_test_run_status", "get_test_run_result",
+    ]
+    assert calls == []
+    assert time.monotonic() - started < 1
@@ -21,9 +21,9 @@ async def list_tests(
     unity_instance = get_unity_instance_from_context(ctx)
 
     params: dict[str, Any] = {}
-    normalized_mode = (mode or "All").strip()
-    if normalized_mode.lower() != "all":
-        params["mode"] = normalized_mode
+    # The Literal annotation already restricts mode to its exact spellings
+    if mode != "All":
+        params["mode"] = mode
 
     response = await async_send_with_unity_instance(
         async_send_command_with_retry,
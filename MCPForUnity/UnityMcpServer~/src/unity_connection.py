@@ -31,6 +31,15 @@ _connection_lock = threading.Lock()
 FRAMED_MAX = 64 * 1024 * 1024
 
 
+class UnsupportedCommandError(Exception):
+    """Unity answered that it has no handler for the command (e.g. an older bridge)."""
+
+
+def is_unsupported_command_error(message: Any) -> bool:
+    """Return True if an error message is Unity's reply to an unknown command type."""
+    return "unknown or unsupported command type" in str(message or "").lower()
+
+
 @dataclass
 class UnityConnection:
     """Manages the socket connection to the Unity Editor."""
@@ -175,7 +184,7 @@ class UnityConnection:
                 chunk = sock.recv(buffer_size)
                 if not chunk:
                     if not chunks:
-                        raise Exception(
+                        raise ConnectionError(
                             "Connection closed before receiving data")
                     break
                 chunks.append(chunk)
@@ -220,7 +229,7 @@ class UnityConnection:
                     continue
         except socket.timeout:
             logger.warning("Socket timeout during receive")
-            raise Exception("Timeout receiving Unity response")
+            raise TimeoutError("Timeout receiving Unity response")
         except Exception as e:
             logger.error(f"Error during receive: {str(e)}")
             raise
@@ -282,7 +291,7 @@ class UnityConnection:
             try:
                 # Ensure connected (handshake occurs within connect())
                 if not self.sock and not self.connect():
-                    raise Exception("Could not connect to Unity")
+                    raise ConnectionError("Could not connect to Unity")
 
                 # Build payload
                 if command_type == 'ping':
@@ -335,8 +344,13 @@ class UnityConnection:
                 if resp.get('status') == 'error':
                     err = resp.get('error') or resp.get(
                         'message', 'Unknown Unity error')
+                    if is_unsupported_command_error(err):
+                        raise UnsupportedCommandError(err)
                     raise Exception(err)
                 return resp.get('result', {})
+            except UnsupportedCommandError:
+                # Unity answered; reconnecting and resending cannot change the outcome
+                raise
             except Exception as e:
                 logger.warning(
                     f"Unity communication attempt {attempt+1} failed: {e}")
@@ -606,6 +620,28 @@ class UnityConnectionPool:
 
             return self._connections[target.id]
 
+    def open_dedicated_connection(self, instance_identifier: Optional[str] = None) -> UnityConnection:
+        """
+        Open a connection to a Unity instance that is not shared through the pool.
+
+        Long-polling commands (e.g. subscribe_test_run) hold the socket until Unity
+        responds; a dedicated connection keeps them from blocking other commands on
+        the pooled socket. The caller owns the connection and must disconnect() it.
+
+        Raises:
+            ConnectionError: If instance cannot be found or connected
+        """
+        instances = self.discover_all_instances()
+        target = self._resolve_instance_id(instance_identifier, instances)
+
+        conn = UnityConnection(port=target.port, instance_id=target.id)
+        if not conn.connect():
+            raise ConnectionError(
+                f"Failed to connect to Unity instance '{target.id}' on port {target.port}. "
+                f"Ensure the Unity Editor is running."
+            )
+        return conn
+
     def disconnect_all(self):
         """Disconnect all active connections"""
         with self._pool_lock:
@@ -694,6 +730,16 @@ def send_command_with_retry(
     structured failure if retries are exhausted.
     """
     conn = get_unity_connection(instance_id)
+    return _send_with_reload_retry(conn, command_type, params, max_retries, retry_ms)
+
+
+def _send_with_reload_retry(
+    conn: UnityConnection,
+    command_type: str,
+    params: Dict[str, Any],
+    max_retries: int | None,
+    retry_ms: int | None,
+) -> Dict[str, Any]:
     if max_retries is None:
         max_retries = getattr(config, "reload_max_retries", 40)
     if retry_ms is None:
@@ -743,3 +789,47 @@ async def async_send_command_with_retry(
         )
     except Exception as e:
         return MCPResponse(success=False, error=str(e))
+
+
+class KeepaliveConnection:
+    """Async handle that reuses one resolved UnityConnection across many sends."""
+
+    def __init__(self, conn: UnityConnection):
+        self.conn = conn
+
+    async def send(
+        self,
+        command_type: str,
+        params: dict[str, Any],
+        *,
+        max_retries: int | None = None,
+        retry_ms: int | None = None
+    ) -> dict[str, Any] | MCPResponse:
+        """Send a command on the held connection, waiting politely through Unity reloads.
+
+        Unlike async_send_command_with_retry, transport failures are raised so callers
+        can fall back to a fresh pool lookup.
+        """
+        import asyncio  # local import to avoid mandatory asyncio dependency for sync callers
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: _send_with_reload_retry(self.conn, command_type, params, max_retries, retry_ms),
+        )
+
+
+@contextlib.asynccontextmanager
+async def keepalive(instance_id: Optional[str] = None):
+    """Resolve the connection for a Unity instance once and reuse it for a burst of commands.
+
+    Skips the per-command discovery and instance resolution done by get_unity_connection,
+    which matters for callers that poll (e.g. waiting on a test run). The socket belongs
+    to the pool, so it stays open after the block exits.
+
+    Raises:
+        ConnectionError: If instance cannot be found or connected
+    """
+    import asyncio  # local import to avoid mandatory asyncio dependency for sync callers
+    loop = asyncio.get_running_loop()
+    conn = await loop.run_in_executor(None, get_unity_connection, instance_id)
+    yield KeepaliveConnection(conn)
@@ -10,7 +10,7 @@ from __future__ import annotations
 import os
 import sys
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Optional
 
 _BOOTSTRAPPED = False
 _RESOLVED_PATH: Optional[Path] = None
@@ -24,14 +24,16 @@ def _find_repo_root() -> Optional[Path]:
     return None
 
 
-def _candidate_paths() -> Iterable[Path]:
-    """Yield possible locations for the shared server sources."""
+def _build_candidates() -> tuple[Path, ...]:
+    """Possible locations for the shared server sources, in priority order."""
+    candidates: list[Path] = []
+
     override = os.environ.get("UNITY_MCP_SERVER_PATH")
     if override:
         for chunk in override.split(os.pathsep):
             chunk = chunk.strip()
             if chunk:
-                yield Path(chunk).expanduser()
+                candidates.append(Path(chunk).expanduser())
 
     # Windows install surfaced into WSL via env vars from interop
     win_profile = (
@@ -40,24 +42,26 @@ def _candidate_paths() -> Iterable[Path]:
         or os.environ.get("USERPROFILE")
     )
     if win_profile:
-        yield Path(win_profile).expanduser() / "AppData/Local/UnityMCP/UnityMcpServer/src"
+        candidates.append(Path(win_profile).expanduser() / "AppData/Local/UnityMCP/UnityMcpServer/src")
 
     username = os.environ.get("USERNAME") or os.environ.get("USER")
     if username:
-        yield Path("/mnt/c/Users") / username / "AppData/Local/UnityMCP/UnityMcpServer/src"
+        candidates.append(Path("/mnt/c/Users") / username / "AppData/Local/UnityMCP/UnityMcpServer/src")
 
     # Linux/mac dev installs (matches ServerInstaller fallbacks)
     home = Path.home()
-    yield home / ".config/UnityMCP/UnityMcpServer/src"
-    yield home / ".local/share/UnityMCP/UnityMcpServer/src"
+    candidates.append(home / ".config/UnityMCP/UnityMcpServer/src")
+    candidates.append(home / ".local/share/UnityMCP/UnityMcpServer/src")
 
     # Repo copies (package + WSL helper)
     repo_root = _find_repo_root()
     if repo_root:
         assets_root = repo_root / "Assets"
-        yield assets_root / "MCP" / "UnityMcpServer~" / "src"
-        yield assets_root / "unity-mcp-wsl2" / "MCPForUnity" / "UnityMcpServer~" / "src"
-        yield assets_root / "unity-mcp-wsl2" / "Server"  # legacy fallback
+        candidates.append(assets_root / "MCP" / "UnityMcpServer~" / "src")
+        candidates.append(assets_root / "unity-mcp-wsl2" / "MCPForUnity" / "UnityMcpServer~" / "src")
+        candidates.append(assets_root / "unity-mcp-wsl2" / "Server")  # legacy fallback
+
+    return tuple(candidates)
 
 
 def ensure_shared_server_on_path() -> Optional[Path]:
@@ -66,11 +70,9 @@ def ensure_shared_server_on_path() -> Optional[Path]:
     if _BOOTSTRAPPED:
         return _RESOLVED_PATH
 
-    for path in _candidate_paths():
-        if not path:
-            continue
+    for path in _build_candidates():
         try:
-            expanded = path.expanduser().resolve()
+            expanded = path.resolve()
         except Exception:
             continue
 
@@ -0,0 +1,44 @@
+import sys
+
+import bootstrap_shared_server as bootstrap
+
+
+def _restart(monkeypatch):
+    """Simulate a fresh interpreter start."""
+    monkeypatch.setattr(bootstrap, "_BOOTSTRAPPED", False)
+    monkeypatch.setattr(bootstrap, "_RESOLVED_PATH", None)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.delenv("UNITY_MCP_SERVER_PATH_RESOLVED", raising=False)
+
+
+def _isolate_home(monkeypatch, home):
+    for name in ("UNITY_MCP_SERVER_PATH", "WIN_USERPROFILE", "WSL_WIN_USERPROFILE", "USERPROFILE", "USERNAME", "USER"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HOME", str(home))
+
+
+def _install(root):
+    (root / "tools").mkdir(parents=True)
+    return root.resolve()
+
+
+def test_higher_priority_install_wins_on_next_start(monkeypatch, tmp_path):
+    _isolate_home(monkeypatch, tmp_path)
+    local = _install(tmp_path / ".local/share/UnityMCP/UnityMcpServer/src")
+
+    _restart(monkeypatch)
+    assert bootstrap.ensure_shared_server_on_path() == local
+
+    config = _install(tmp_path / ".config/UnityMCP/UnityMcpServer/src")
+    _restart(monkeypatch)
+    assert bootstrap.ensure_shared_server_on_path() == config
+    assert sys.path[0] == str(config)
+
+
+def test_candidates_without_server_sources_are_skipped(monkeypatch, tmp_path):
+    _isolate_home(monkeypatch, tmp_path)
+    (tmp_path / ".config/UnityMCP/UnityMcpServer/src").mkdir(parents=True)
+    local = _install(tmp_path / ".local/share/UnityMCP/UnityMcpServer/src")
+
+    _restart(monkeypatch)
+    assert bootstrap.ensure_shared_server_on_path() == local
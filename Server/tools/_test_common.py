@@ -0,0 +1,537 @@
+"""Shared models, coercion helpers, and run-completion waiting for the Unity test tools."""
+from itertools import chain
+from typing import Any
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+
+from pydantic import BaseModel
+
+from models import MCPResponse
+from tools import async_send_with_unity_instance
+from unity_connection import (
+    KeepaliveConnection,
+    UnsupportedCommandError,
+    async_send_command_with_retry,
+    get_unity_connection_pool,
+    is_unsupported_command_error,
+    keepalive,
+)
+
+logger = logging.getLogger("mcp-for-unity-server")
+
+
+class RunTestsSummary(BaseModel):
+    total: int
+    passed: int
+    failed: int
+    skipped: int
+    durationSeconds: float
+    resultState: str
+
+
+class RunTestsTestResult(BaseModel):
+    name: str
+    fullName: str
+    state: str
+    durationSeconds: float
+    message: str | None = None
+    stackTrace: str | None = None
+    output: str | None = None
+
+
+class RunTestsResult(BaseModel):
+    runId: str | None = None
+    mode: str | None = None
+    state: str | None = None
+    summary: RunTestsSummary | None = None
+    results: list[RunTestsTestResult] | None = None
+
+
+class RunTestsResponse(MCPResponse):
+    data: RunTestsResult | None = None
+
+
+FINAL_STATES = {"completed", "failed", "canceled", "cancelled", "faulted"}
+# Fallback status polling (bridges that cannot push run completion) backs off
+# exponentially with jitter while the run state stays unchanged.
+POLL_BACKOFF_BASE_SECONDS = 0.5
+POLL_BACKOFF_CAP_SECONDS = 10.0
+PROGRESS_LOG_INTERVAL = 5.0
+DEFAULT_TIMEOUT_SECONDS = 600
+# Seconds Unity holds each subscribe_test_run long-poll before answering "still running"
+SUBSCRIBE_WAIT_SECONDS = 20
+
+# Seconds an older bridge is remembered before it is probed again (the package can be
+# upgraded while the editor stays open)
+LEGACY_BRIDGE_TTL_SECONDS = 300.0
+
+# Resolved instance ids whose bridge predates subscribe_test_run/get_test_run_snapshot,
+# mapped to when the entry expires. Both commands shipped together, so one
+# "unsupported command" reply rules out both.
+_LEGACY_BRIDGES: dict[str, float] = {}
+
+
+_TIMEOUT_SNAPSHOT_KEYS = ("runId", "mode", "state", "summary")
+
+
+class RunCompletionTimeout(Exception):
+    def __init__(self, run_id: str, timeout_seconds: int, snapshot: dict | None = None):
+        self.run_id = run_id
+        self.timeout_seconds = timeout_seconds
+        # Keep only what callers report back; per-test results would stay pinned by the traceback
+        snapshot = snapshot or {}
+        self.snapshot = {k: snapshot[k] for k in _TIMEOUT_SNAPSHOT_KEYS if k in snapshot}
+        super().__init__(f"Test run '{run_id}' did not finish within {timeout_seconds} seconds.")
+
+
+def coerce_int(value, default=None):
+    """Best-effort conversion to a positive integer."""
+    if value is None:
+        return default
+    try:
+        if isinstance(value, bool):
+            return default
+        if isinstance(value, int):
+            return value if value > 0 else default
+        s = str(value).strip()
+        if s.lower() in ("", "none", "null"):
+            return default
+        as_int = int(float(s))
+        return as_int if as_int > 0 else default
+    except Exception:
+        return default
+
+
+def coerce_bool(value, default=None):
+    """Normalize disparate truthy/falsy input values."""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y", "on"):
+        return True
+    if text in ("false", "0", "no", "n", "off"):
+        return False
+    return default
+
+
+_SEQ_TYPES = (list, tuple, set, frozenset)
+
+
+def coerce_string_list(value: Any) -> list[str] | None:
+    """Accept strings, iterables of strings, or scalars and return distinct values."""
+    if value is None:
+        return None
+    # Exact-type check for the shapes MCP clients send; skips the Iterable ABC lookup
+    if type(value) not in _SEQ_TYPES and (isinstance(value, str) or not hasattr(value, "__iter__")):
+        value = (value,)
+    # dict.fromkeys dedupes in insertion order without a separate seen-set pass
+    unique = list(dict.fromkeys(
+        text for text in (str(item).strip() for item in value if item is not None) if text
+    ))
+    return unique or None
+
+
+def combine_string_lists(*values: Any) -> list[str] | None:
+    normalized = filter(None, map(coerce_string_list, values))
+    return list(dict.fromkeys(chain.from_iterable(normalized))) or None
+
+
+def build_summary_message(run_id: str, result_data: dict | None) -> str:
+    summary = (result_data or {}).get("summary")
+    if not summary:
+        return f"Run '{run_id}' finished with state Unknown."
+    result_state = summary.get("resultState") or "Unknown"
+    total, passed, failed, skipped = (summary.get(k) for k in ("total", "passed", "failed", "skipped"))
+    if total is None and passed is None and failed is None and skipped is None:
+        return f"Run '{run_id}' finished with state {result_state}."
+    return (
+        f"Run '{run_id}' finished with state {result_state}: "
+        f"{passed or 0}/{total or 0} passed, {failed or 0} failed, {skipped or 0} skipped."
+    )
+
+
+def _next_poll_delay(attempt: int) -> float:
+    """Truncated exponential backoff with jitter for status polling."""
+    delay = min(POLL_BACKOFF_CAP_SECONDS, POLL_BACKOFF_BASE_SECONDS * 2 ** min(attempt, 16))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def _is_legacy_bridge(instance_id: str | None) -> bool:
+    expires = _LEGACY_BRIDGES.get(instance_id) if instance_id else None
+    if expires is None:
+        return False
+    if expires <= time.monotonic():
+        _LEGACY_BRIDGES.pop(instance_id, None)
+        return False
+    return True
+
+
+def _mark_legacy_bridge(instance_id: str | None) -> None:
+    if instance_id:
+        _LEGACY_BRIDGES[instance_id] = time.monotonic() + LEGACY_BRIDGE_TTL_SECONDS
+
+
+def _progress_log_interval() -> float:
+    """Jittered progress-log interval so concurrent runs do not log (and poll) in lockstep."""
+    return PROGRESS_LOG_INTERVAL * random.uniform(0.8, 1.2)
+
+
+class _RunSubscription:
+    """Completion event for a single run, fed by a background subscribe_test_run reader.
+
+    Concurrent waiters on the same run share one subscription. The reader stops once
+    Unity reports completion, the subscription fails, or the last waiter gives up.
+    """
+
+    def __init__(self, unity_instance: str | None, run_id: str):
+        self.run_id = run_id
+        self.event = asyncio.Event()
+        self.completed = False
+        self.unsupported = False
+        self.status: dict | None = None
+        self.result: dict | None = None
+        self.waiters = 0
+        self._stop = threading.Event()
+        self._task = asyncio.create_task(self._read(unity_instance))
+
+    async def _read(self, unity_instance: str | None) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            self.completed = await loop.run_in_executor(None, self._subscribe_blocking, unity_instance)
+        except Exception as exc:
+            logger.debug(f"subscribe_test_run unavailable for run '{self.run_id}': {exc}")
+        finally:
+            self.event.set()
+            self._unregister()
+
+    def _subscribe_blocking(self, unity_instance: str | None) -> bool:
+        """Re-issue bounded long-polls until Unity reports the run finished."""
+        # Dedicated socket so the long-poll never holds the pooled connection's IO lock
+        conn = get_unity_connection_pool().open_dedicated_connection(unity_instance)
+        try:
+            if _is_legacy_bridge(conn.instance_id):
+                # Already known to predate subscribe_test_run: skip the probe
+                self.unsupported = True
+                return False
+            while not self._stop.is_set():
+                try:
+                    resp = conn.send_command(
+                        "subscribe_test_run",
+                        {"runId": self.run_id, "timeoutSeconds": SUBSCRIBE_WAIT_SECONDS, "includeResult": True},
+                    )
+                except UnsupportedCommandError:
+                    # Older bridge: fall back to status polling straight away
+                    _mark_legacy_bridge(conn.instance_id)
+                    self.unsupported = True
+                    return False
+                if not isinstance(resp, dict):
+                    # Preflight reload hint: wait it out, then subscribe again
+                    hint = getattr(resp, "data", None) or {}
+                    if hint.get("state") != "reloading":
+                        return False
+                    time.sleep(int(hint.get("retry_after_ms", 250)) / 1000.0)
+                    continue
+                if not resp.get("success"):
+                    return False
+                data = resp.get("data") or {}
+                self.status = data.get("status") or self.status
+                if data.get("completed"):
+                    # Newer bridges attach the final result, saving a get_test_run_result call
+                    self.result = data.get("result")
+                    return True
+            return False
+        finally:
+            conn.disconnect()
+
+    def _unregister(self) -> None:
+        if _RUN_SUBSCRIPTIONS.get(self.run_id) is self:
+            del _RUN_SUBSCRIPTIONS[self.run_id]
+
+    def release(self) -> None:
+        self.waiters -= 1
+        if self.waiters <= 0:
+            self._stop.set()
+            self._unregister()
+
+
+_RUN_SUBSCRIPTIONS: dict[str, _RunSubscription] = {}
+
+
+def _subscribe_to_run(unity_instance: str | None, run_id: str) -> _RunSubscription:
+    subscription = _RUN_SUBSCRIPTIONS.get(run_id)
+    if subscription is None:
+        subscription = _RunSubscription(unity_instance, run_id)
+        _RUN_SUBSCRIPTIONS[run_id] = subscription
+    subscription.waiters += 1
+    return subscription
+
+
+async def _send(
+    unity_instance: str | None,
+    command_type: str,
+    params: dict[str, Any],
+    conn: KeepaliveConnection | None = None,
+) -> Any:
+    if conn is not None:
+        try:
+            return await conn.send(command_type, params)
+        except OSError as exc:  # includes ConnectionError and TimeoutError
+            # Held connection dropped; fall back to a fresh pool lookup
+            logger.debug(f"Keepalive send of '{command_type}' failed ({exc}); retrying via pool")
+        except Exception as exc:
+            # Unity answered with an error; resending through the pool would only repeat it
+            return MCPResponse(success=False, error=str(exc))
+    return await async_send_with_unity_instance(
+        async_send_command_with_retry,
+        unity_instance,
+        command_type,
+        params,
+    )
+
+
+async def _fetch_status_snapshot(unity_instance: str | None, run_id: str) -> dict | None:
+    try:
+        status_resp = await async_send_with_unity_instance(
+            async_send_command_with_retry,
+            unity_instance,
+            "get_test_run_status",
+            {"runId": run_id},
+        )
+    except Exception:
+        return None
+    if isinstance(status_resp, dict) and status_resp.get("success"):
+        return status_resp.get("data") or {}
+    return None
+
+
+def _is_unsupported_command(resp: Any) -> bool:
+    error = resp.get("error") if isinstance(resp, dict) else getattr(resp, "error", None)
+    return is_unsupported_command_error(error)
+
+
+async def _send_snapshot(
+    unity_instance: str | None,
+    run_id: str,
+    conn: KeepaliveConnection | None = None,
+) -> tuple[Any, Any] | None:
+    """Fetch run status, plus the result once finished, in one bridge call.
+
+    Returns (status_resp, result_resp) shaped like the get_test_run_status and
+    get_test_run_result replies, or None when the bridge predates get_test_run_snapshot.
+    """
+    resp = await _send(unity_instance, "get_test_run_snapshot", {"runId": run_id, "includeResult": True}, conn)
+    if not (isinstance(resp, dict) and resp.get("success")):
+        return None if _is_unsupported_command(resp) else (resp, None)
+    data = resp.get("data") or {}
+    result = data.get("result")
+    return (
+        {"success": True, "data": data.get("status") or {}},
+        {"success": True, "data": result} if result is not None else None,
+    )
+
+
+async def _fetch_final_result(
+    unity_instance: str | None,
+    run_id: str,
+    snapshot: dict,
+    result_resp: Any = None,
+    conn: KeepaliveConnection | None = None,
+) -> dict:
+    if not (isinstance(result_resp, dict) and result_resp.get("success")):
+        result_resp = await _send(unity_instance, "get_test_run_result", {"runId": run_id}, conn)
+    if isinstance(result_resp, dict) and result_resp.get("success"):
+        data = result_resp.get("data") or {}
+        data.setdefault("state", snapshot.get("state"))
+        return data
+
+    # Fallback to snapshot information if detailed results are unavailable
+    return {
+        "runId": snapshot.get("runId") or run_id,
+        "mode": snapshot.get("mode"),
+        "state": snapshot.get("state"),
+        "summary": snapshot.get("summary"),
+        "results": None,
+    }
+
+
+async def wait_for_run_completion(
+    ctx,
+    unity_instance: str | None,
+    run_id: str,
+    timeout_seconds: int,
+    initial_snapshot: dict | None = None,
+) -> dict:
+    """Wait for Unity to report run completion, then fetch the final results.
+
+    Completion is pushed through the bridge's subscribe_test_run long-poll; status
+    polling is only used when the connected Unity bridge cannot provide it. Pass the
+    payload Unity returned when starting the run as initial_snapshot so runs that
+    already finished skip waiting entirely.
+    """
+    if not run_id:
+        raise ValueError("run_id is required to wait for completion")
+
+    if (
+        initial_snapshot
+        and initial_snapshot.get("runId") == run_id
+        and (initial_snapshot.get("state") or "").lower() in FINAL_STATES
+    ):
+        # Unity finished synchronously (e.g. no tests matched the filters)
+        if initial_snapshot.get("results") is not None:
+            return initial_snapshot
+        return await _fetch_final_result(unity_instance, run_id, initial_snapshot)
+
+    start_time = time.monotonic()
+    deadline = start_time + timeout_seconds if timeout_seconds else None
+
+    subscription = await _wait_for_subscription(
+        ctx, unity_instance, run_id, timeout_seconds, start_time, deadline
+    )
+    if subscription.completed:
+        result_resp = {"success": True, "data": subscription.result} if subscription.result is not None else None
+        return await _fetch_final_result(unity_instance, run_id, subscription.status or {}, result_resp)
+
+    return await _poll_for_run_completion(
+        ctx, unity_instance, run_id, timeout_seconds, start_time, deadline, legacy=subscription.unsupported
+    )
+
+
+async def _wait_for_subscription(
+    ctx,
+    unity_instance: str | None,
+    run_id: str,
+    timeout_seconds: int,
+    start_time: float,
+    deadline: float | None,
+) -> _RunSubscription:
+    """Wait until the run's subscription reports completion or gives up."""
+    subscription = _subscribe_to_run(unity_instance, run_id)
+    wait_for, monotonic = asyncio.wait_for, time.monotonic
+    try:
+        while not subscription.event.is_set():
+            now = monotonic()
+            if deadline and now >= deadline:
+                snapshot = await _fetch_status_snapshot(unity_instance, run_id)
+                raise RunCompletionTimeout(run_id, timeout_seconds, snapshot or subscription.status)
+
+            wait = _progress_log_interval()
+            if deadline is not None:
+                wait = min(wait, deadline - now)
+            try:
+                await wait_for(subscription.event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                elapsed = monotonic() - start_time
+                await ctx.info(f"Run '{run_id}' still running after {elapsed:.1f}s...")
+    finally:
+        subscription.release()
+    return subscription
+
+
+async def _poll_for_run_completion(
+    ctx,
+    unity_instance: str | None,
+    run_id: str,
+    timeout_seconds: int,
+    start_time: float,
+    deadline: float | None,
+    *,
+    legacy: bool = False,
+) -> dict:
+    """Poll Unity for run status until completion or timeout."""
+    async with contextlib.AsyncExitStack() as stack:
+        try:
+            conn = await stack.enter_async_context(keepalive(unity_instance))
+        except Exception:
+            conn = None  # resolve per command instead
+        return await _poll_status_loop(
+            ctx, unity_instance, run_id, timeout_seconds, start_time, deadline, conn, legacy
+        )
+
+
+async def _poll_status_loop(
+    ctx,
+    unity_instance: str | None,
+    run_id: str,
+    timeout_seconds: int,
+    start_time: float,
+    deadline: float | None,
+    conn: KeepaliveConnection | None,
+    legacy: bool = False,
+) -> dict:
+    last_snapshot: dict | None = None
+    last_state: str | None = None
+    last_log = 0.0
+    log_interval = _progress_log_interval()
+    attempt = 0
+    bridge_id = conn.conn.instance_id if conn is not None else None
+    fused = not (legacy or _is_legacy_bridge(bridge_id))
+    # Bound once: the loop may run for the whole timeout
+    sleep, monotonic, send = asyncio.sleep, time.monotonic, _send
+    send_snapshot = _send_snapshot
+
+    while True:
+        state: str | None = None
+        result_resp: Any = None
+        try:
+            responses = await send_snapshot(unity_instance, run_id, conn) if fused else None
+            if responses is None:
+                # Bridge predates get_test_run_snapshot: poll status alone, fetch the result once finished
+                if fused:
+                    fused = False
+                    _mark_legacy_bridge(bridge_id)
+                responses = (await send(unity_instance, "get_test_run_status", {"runId": run_id}, conn), None)
+            status_resp, result_resp = responses
+        except Exception as exc:
+            now = monotonic()
+            if now - last_log >= log_interval:
+                await ctx.info(f"Run '{run_id}' status unavailable ({exc}); retrying...")
+                last_log = now
+                log_interval = _progress_log_interval()
+            status_resp = None
+
+        if isinstance(status_resp, dict) and status_resp.get("success"):
+            snapshot = status_resp.get("data") or {}
+            last_snapshot = snapshot
+            state = (snapshot.get("state") or "").lower()
+            if state in FINAL_STATES:
+                return await _fetch_final_result(unity_instance, run_id, snapshot, result_resp, conn)
+
+        now = monotonic()
+        if deadline and now >= deadline:
+            raise RunCompletionTimeout(run_id, timeout_seconds, last_snapshot)
+
+        # If Unity reports an error (e.g., run trimmed) attempt to fetch final result anyway.
+        if isinstance(status_resp, dict) and not status_resp.get("success"):
+            error_text = (status_resp.get("error") or status_resp.get("message") or "").lower()
+            if "not found" in error_text or "no active" in error_text:
+                if not (isinstance(result_resp, dict) and result_resp.get("success")):
+                    result_resp = await send(unity_instance, "get_test_run_result", {"runId": run_id}, conn)
+                if isinstance(result_resp, dict) and result_resp.get("success"):
+                    return result_resp.get("data") or {}
+
+        if now - last_log >= log_interval:
+            state_str = (last_snapshot or {}).get("state") or "pending"
+            elapsed = now - start_time
+            await ctx.info(f"Run '{run_id}' still {state_str} after {elapsed:.1f}s...")
+            last_log = now
+            log_interval = _progress_log_interval()
+
+        # Poll quickly right after a state transition, back off while nothing changes
+        if state is not None and state != last_state:
+            last_state = state
+            attempt = 0
+        else:
+            attempt += 1
+        delay = _next_poll_delay(attempt)
+        if deadline:
+            # Jitter must not carry the last sleep past the caller's timeout
+            delay = max(0.0, min(delay, deadline - monotonic()))
+        await sleep(delay)
@@ -6,10 +6,8 @@ from pydantic import Field
 
 from registry import mcp_for_unity_tool
 from tools import async_send_with_unity_instance, get_unity_instance_from_context
-from unity_connection import async_send_command_with_retry
-
-from .run_tests import (
-    DefaultTimeoutSeconds,
+from tools._test_common import (
+    DEFAULT_TIMEOUT_SECONDS,
     RunCompletionTimeout,
     RunTestsResponse,
     build_summary_message,
@@ -17,6 +15,7 @@ from .run_tests import (
     coerce_int,
     wait_for_run_completion,
 )
+from unity_connection import async_send_command_with_retry
 
 
 @mcp_for_unity_tool(description="Reruns failed Unity tests from a previous run")
@@ -42,7 +41,7 @@ async def rerun_failed_tests(
     params["waitForCompletion"] = False
 
     timeout = coerce_int(timeout_seconds)
-    wait_timeout = timeout or DefaultTimeoutSeconds
+    wait_timeout = timeout or DEFAULT_TIMEOUT_SECONDS
     if timeout is not None:
         params["timeoutSeconds"] = timeout
 
@@ -56,14 +55,15 @@ async def rerun_failed_tests(
         return response
 
     if not wait:
-        return RunTestsResponse(**response)
+        return RunTestsResponse.model_validate(response)
 
     run_id_from_response = (response.get("data") or {}).get("runId") or run_id
     if not run_id_from_response:
-        return RunTestsResponse(**response)
+        return RunTestsResponse.model_validate(response)
 
     try:
-        final_data = await wait_for_run_completion(ctx, unity_instance, run_id_from_response, wait_timeout)
+        final_data = await wait_for_run_completion(
+            ctx, unity_instance, run_id_from_response, wait_timeout, initial_snapshot=response.get("data"))
     except RunCompletionTimeout as exc:
         snapshot = exc.snapshot or {"runId": run_id_from_response, "state": "Unknown"}
         message = f"Failed-test rerun '{run_id_from_response}' is still running after {exc.timeout_seconds} seconds."